@@ -1,8 +1,12 @@
 import asyncio
-import os
+import functools
 import random
 import re
-from typing import Dict, List, Tuple
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import astrbot.api.message_components as Comp
 from astrbot.api import AstrBotConfig, logger
@@ -11,6 +15,97 @@ from astrbot.api.provider import LLMResponse
 from astrbot.api.star import Context, Star, register
 from astrbot.core.utils.session_waiter import SessionController, session_waiter
 
+# 题库文件路径
+_QUESTIONS_FILE = Path(__file__).resolve().parent / "questions_database.txt"
+
+# 预编译的正则表达式
+_STORY_RE = re.compile(r"故事：\s*(.*?)\s*答案：", re.DOTALL)
+_ANSWER_RE = re.compile(r"答案：\s*(.*)", re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 猜测答案的判断关键词：明确的推理/断言、长句中的结论词、与"是"搭配的事件词
+_GUESS_KEYWORDS = {
+    "strong": ("答案是", "真相是", "因为", "所以", "是因为", "原因是", "我觉得是", "我认为是", "应该是", "一定是", "肯定是"),
+    "conclusion": ("导致", "造成", "结果", "发生了", "事实是"),
+    "event": ("死", "杀", "害", "做", "发生"),
+    "affirm": ("是",),
+}
+
+
+def _build_guess_scanner() -> Tuple["re.Pattern", Dict[str, frozenset]]:
+    """构建一次扫描即可找出所有猜测关键词类别的正则及关键词到类别的映射。"""
+    keyword_categories: Dict[str, set] = {}
+    for category, keywords in _GUESS_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, set()).add(category)
+    # 同一位置只会匹配最长的关键词，因此把其前缀关键词的类别一并归入
+    tagged = {
+        keyword: frozenset(
+            category
+            for other, categories in keyword_categories.items() if keyword.startswith(other)
+            for category in categories
+        )
+        for keyword in keyword_categories
+    }
+    alternation = "|".join(map(re.escape, sorted(keyword_categories, key=len, reverse=True)))
+    # 零宽先行断言使每个位置都被检查，得到可重叠的全部匹配
+    return re.compile(f"(?=({alternation}))"), tagged
+
+
+_GUESS_RE, _GUESS_CATEGORIES = _build_guess_scanner()
+
+# AI允许的标准回答，按包含匹配时的优先级排列
+_VALID_RESPONSE_PRIORITY = ('是', '否', '无关', '请重新提问', '很接近了', '你猜对了一部分')
+_VALID_RESPONSES = frozenset(_VALID_RESPONSE_PRIORITY)
+_RESPONSE_PUNCTUATION = str.maketrans('', '', '。！.!')
+
+# 简单答案检查：中文连续字符串和长度不小于2的英文/数字单词
+_KEYWORD_RE = re.compile(r"[\u4e00-\u9fff]{2,}|[a-z0-9]{2,}")
+_STOP_WORDS = frozenset({'的', '了', '是', '在', '和', '与', '或', '但', '然后', '因为', '所以', '这', '那', '一个', '就', '也', '都'})
+
+# 难度星级显示，按难度（0-5）索引
+_DIFFICULTY_STARS = ("", "⭐", "⭐⭐", "⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐⭐⭐")
+
+# LLM回答缓存的最大条目数
+_LLM_CACHE_SIZE = 4096
+# 对话历史中保留的最近问答轮数（不含系统提示词）
+_CONTEXT_MAX_TURNS = 8
+# 会话超时刷新的容差（秒），剩余时间与完整超时相差不超过此值时不重置计时器
+_KEEP_ALIVE_SLACK = 5
+
+
+@functools.lru_cache(maxsize=64)
+def _static_chain(text: str) -> MessageChain:
+    """为固定文本构造可复用的消息链，发送时框架只读取其内容。"""
+    return MessageChain([Comp.Plain(text)])
+
+
+def require_admin(handler):
+    """命令处理器装饰器：非管理员调用时回复权限不足并终止事件。"""
+    @functools.wraps(handler)
+    async def wrapper(self, event: AstrMessageEvent, *args, **kwargs):
+        if not event.is_admin():
+            await self._send_static(event, "❌ 权限不足，只有管理员可操作此命令。")
+            event.stop_event()
+            return
+        return await handler(self, event, *args, **kwargs)
+    return wrapper
+
+
+@dataclass(slots=True)
+class GameState:
+    """单个会话的海龟汤游戏状态。"""
+    question: str
+    answer: str
+    metadata: dict
+    question_count: int = 0
+    answer_keywords: frozenset = frozenset()
+    llm_conversation_context: List[dict] = field(default_factory=list)
+    controller: Optional[SessionController] = None  # 首次交互时存储会话控制器
+    reveal_text: Optional[str] = None  # 缓存的答案公布文本，换题时清空
+    reveal_count: int = -1  # 生成 reveal_text 时的提问次数
+    timer_expiry: float = 0.0  # 上次重置后会话超时的时间点（time.monotonic）
+
 
 @register("turtlesoup", "anchorAnc", "海龟汤互动解谜游戏，支持LLM自动出题和预设题库", "1.0.0")
 class TurtleSoupPlugin(Star):
@@ -70,6 +165,35 @@ class TurtleSoupPlugin(Star):
     MSG_AI_CHECKING_ANSWER = "正在判断答案..."
     MSG_AI_ERROR = "AI暂时无法回应，请尝试 /强制结束海龟汤 重新开始。"
     MSG_UNKNOWN_ERROR = "游戏发生错误，已结束。"
+    MSG_HELP = (
+        "🐢 海龟汤推理游戏 - 帮助手册 🐢\n\n"
+        "欢迎来到由AI驱动的海龟汤推理世界！\n\n"
+        "基本指令:\n"
+        "  - `/开始海龟汤`：随机开始一局新游戏\n"
+        "  - `/开始海龟汤 题号`：选择特定题目开始游戏\n"
+        "  - `/海龟汤提问 你的问题`：在游戏中提问\n"
+        "  - `/结束海龟汤`：主动结束当前游戏并查看答案\n"
+        "  - `/强制结束海龟汤`：立即强制结束当前游戏\n"
+        "  - `/公布答案`：在不结束游戏的情况下查看答案\n"
+        "  - `/换一题`：更换当前题目，提问次数重置\n\n"
+        "题库指令:\n"
+        "  - `/题库列表`：查看所有可用题目\n"
+        "  - `/题库列表 页数`：查看指定页的题目列表\n"
+        "  - `/题目详情 题号`：查看指定题目的详细信息\n\n"
+        "管理员指令:\n"
+        "  - `/admin end turtle`：强制结束所有正在进行的游戏\n\n"
+        "💡 游戏玩法:\n"
+        "  - 游戏开始后，系统会给出一个看似不合理的情景\n"
+        "  - 你的任务是提出可以用'是'、'否'或'无关'回答的问题\n"
+        "  - 提问方式: 使用 `/海龟汤提问 你的问题` 格式\n"
+        "  - 当你觉得已经知道真相时，可以用 `/海龟汤提问 答案是...` 格式说出答案\n"
+        "  - 每局游戏有 {max_questions} 次提问机会和 {session_timeout} 秒思考时间\n\n"
+        "🎯 题目选择:\n"
+        "  - 题目按难度分为 1-5 星级（⭐-⭐⭐⭐⭐⭐）\n"
+        "  - 可以通过题号直接选择喜欢的题目\n"
+        "  - 每个题目都有独特的标题便于识别\n\n"
+        "祝您推理愉快！🕵️‍♀️"
+    )
     MSG_CHANGE_QUESTION = (
         "🔄 换题成功！\n\n"
         "新题目：\n{question}\n\n"
@@ -77,22 +201,79 @@ class TurtleSoupPlugin(Star):
     )
 
     def _get_session_key(self, event: AstrMessageEvent):
-        """获取当前会话的唯一key，群聊为group_id，私聊为user_id。"""
-        group_id = getattr(event, 'get_group_id', lambda: None)()
+        """获取当前会话的唯一key，群聊为group_id，私聊为user_id。结果缓存在事件对象上。"""
+        session_key = getattr(event, "_turtle_soup_session_key", None)
+        if session_key is None:
+            session_key = self._compute_session_key(event)
+            event._turtle_soup_session_key = session_key
+        return session_key
+
+    def _compute_session_key(self, event: AstrMessageEvent):
+        """根据事件计算会话key。"""
+        group_id = event.get_group_id() if self._event_has_group_id else None
         if group_id:
             return group_id
         return event.get_sender_id()
 
+    async def _send_text(self, event: AstrMessageEvent, text: str):
+        """发送一条纯文本消息，空文本不发送。"""
+        if text:
+            await event.send(MessageChain([Comp.Plain(text)]))
+
+    async def _send_static(self, event: AstrMessageEvent, text: str):
+        """发送固定文本消息，复用缓存的消息链。"""
+        await event.send(_static_chain(text))
+
+    def _get_command_arg(self, event: AstrMessageEvent) -> str:
+        """获取命令后的参数部分，没有参数时返回空字符串。"""
+        message_parts = event.message_str.split(maxsplit=1)
+        return message_parts[1].strip() if len(message_parts) > 1 else ''
+
+    def _get_first_arg(self, event: AstrMessageEvent) -> str:
+        """获取命令后的第一个参数，多余的参数忽略，没有参数时返回空字符串。"""
+        message_parts = event.message_str.split(maxsplit=2)
+        return message_parts[1] if len(message_parts) > 1 else ''
+
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
+        self._event_has_group_id = hasattr(AstrMessageEvent, 'get_group_id')
         # 优先使用配置文件参数，否则用默认值
         self.session_timeout = getattr(config, "session_timeout", 1000)
         self.max_questions = getattr(config, "max_questions", 40)
-        plugin_dir = os.path.dirname(os.path.abspath(__file__))
-        self.questions_file_path = os.path.join(plugin_dir, "questions_database.txt")
+        self._disclaimer_text = self.MSG_DISCLAIMER.format(
+            max_questions=self.max_questions,
+            session_timeout=self.session_timeout
+        )
+        self._help_message = self.MSG_HELP.format(
+            max_questions=self.max_questions,
+            session_timeout=self.session_timeout
+        )
+        self.questions_file_path = str(_QUESTIONS_FILE)
         self.questions_bank = self._parse_questions_bank()
-        logger.info(f"题库初始化完成，共加载 {len(self.questions_bank)} 个题目")
-        self.game_states: Dict[str, dict] = {}  # key: group_id or user_id
+        # 题号索引及其在题库中的位置，重复题号时保留第一个出现的题目
+        self._questions_by_id: Dict[str, Tuple[str, str, dict]] = {}
+        self._question_positions: Dict[str, int] = {}
+        for position, question_data in enumerate(self.questions_bank):
+            question_id = question_data[2].get('id')
+            if question_id not in self._questions_by_id:
+                self._questions_by_id[question_id] = question_data
+                self._question_positions[question_id] = position
+        self._list_pages = self._render_list_pages()
+        self._total_pages = len(self._list_pages)
+        logger.info("题库初始化完成，共加载 %d 个题目", len(self.questions_bank))
+        self.game_states: Dict[str, GameState] = {}  # key: group_id or user_id
+        self._rng = random.Random()  # 插件独立的随机数生成器，用于随机选题
+        # LLM回答缓存，key: (题号, 归一化后的玩家输入)
+        self._judge_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._answer_check_cache: "OrderedDict[Tuple[str, str], bool]" = OrderedDict()
+        # 游戏中可直接使用的无参数命令
+        self._turn_commands = {
+            '结束海龟汤': self.end_turtle_soup,
+            '强制结束海龟汤': self.force_end_turtle_soup,
+            '公布答案': self.reveal_answer,
+            '换一题': self.change_question,
+            '海龟汤帮助': self._send_help_message,
+        }
 
         # AI提示词配置
         self.hint_system_prompt = (
@@ -110,6 +291,10 @@ class TurtleSoupPlugin(Star):
             "- 如果玩家猜对了重要的关键信息，但还不是完整答案 → 回答'很接近了'\n\n"
             "当前题目：{question}\n答案：{answer}"
         )
+        # 预先按占位符拆分提示词模板，生成时无需再解析格式字符串
+        prompt_prefix, prompt_rest = self.hint_system_prompt.split("{question}", 1)
+        prompt_middle, prompt_suffix = prompt_rest.split("{answer}", 1)
+        self._format_prompt = lambda q, a, p=prompt_prefix, m=prompt_middle, s=prompt_suffix: f"{p}{q}{m}{a}{s}"
         
         self.answer_check_prompt = (
             "请判断玩家的猜测是否正确。只能回答'是'或'否'，不要添加任何解释。\n\n"
@@ -127,18 +312,24 @@ class TurtleSoupPlugin(Star):
         questions = []
         try:
             with open(self.questions_file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
-            question_blocks = content.split('---')
-            
-            for i, block in enumerate(question_blocks):
-                block = block.strip()
-                if not block or block.startswith('#'):
-                    continue
-                    
-                question_data = self._parse_question_block(block)
-                if question_data:
-                    questions.append(question_data)
+                # 逐行读取，每遇到分隔行 '---' 解析一个题目块
+                block_lines = []
+                skip_block = False
+                for line in f:
+                    line = line.strip()
+                    if line.lstrip('#').strip() == '---':
+                        self._append_question_block(questions, block_lines)
+                        block_lines = []
+                        skip_block = False
+                        continue
+                    if not line or skip_block:
+                        continue
+                    # 以注释开头的块整体跳过
+                    if not block_lines and line.startswith('#'):
+                        skip_block = True
+                        continue
+                    block_lines.append(line)
+                self._append_question_block(questions, block_lines)
                         
         except FileNotFoundError:
             logger.error(f"题库文件未找到: {self.questions_file_path}。将使用默认内置题目。")
@@ -153,24 +344,29 @@ class TurtleSoupPlugin(Star):
         
         return questions
     
+    def _append_question_block(self, questions: List[Tuple[str, str, dict]], block_lines: List[str]):
+        """解析已收集的题目块，成功时追加到题目列表"""
+        if not block_lines:
+            return
+        question_data = self._parse_question_block('\n'.join(block_lines))
+        if question_data:
+            questions.append(question_data)
+
     def _parse_question_block(self, block: str) -> Tuple[str, str, dict]:
         """解析单个题目块"""
-        lines = block.split('\n')
-        question_info = {}
-        
-        for line in lines:
-            line = line.strip()
-            if ':' in line and not line.startswith('#'):
-                key, value = line.split(':', 1)
-                question_info[key.strip()] = value.strip()
+        raw_info = dict(
+            line.split(':', 1) for line in block.splitlines()
+            if ':' in line and not line.lstrip().startswith('#')
+        )
+        question_info = {key.strip(): value.strip() for key, value in raw_info.items()}
         
         if 'ID' in question_info and '汤面' in question_info and '汤底' in question_info:
             try:
                 metadata = {
                     'id': question_info.get('ID', ''),
                     'title': question_info.get('标题', ''),
-                    'difficulty': int(question_info.get('难度', '3')),
-                    'tags': [tag.strip() for tag in question_info.get('标签', '').split(',') if tag.strip()]
+                    'difficulty': min(5, max(0, int(question_info.get('难度', '3')))),
+                    'tags': tuple(tag for tag in map(str.strip, question_info.get('标签', '').split(',')) if tag)
                 }
                 return (question_info['汤面'], question_info['汤底'], metadata)
             except (ValueError, KeyError) as e:
@@ -184,17 +380,17 @@ class TurtleSoupPlugin(Star):
         return [
             ("一个男人推开门，看到眼前的景象后立即跳楼自杀了。为什么？", 
              "这个男人是灯塔管理员，他发现灯塔的灯灭了，意识到因为自己的疏忽导致船只失事，愧疚之下选择了跳楼。",
-             {'id': '001', 'title': '灯塔看守员', 'difficulty': 3, 'tags': ['经典', '自杀', '责任']}),
+             {'id': '001', 'title': '灯塔看守员', 'difficulty': 3, 'tags': ('经典', '自杀', '责任')}),
             ("一个女人在餐厅点了一份海龟汤，喝了一口后就哭了。为什么？", 
              "这个女人曾经和丈夫一起遇难，丈夫告诉她煮的是海龟汤让她活下来，但她现在才知道当时喝的其实是丈夫的肉做的汤。",
-             {'id': '002', 'title': '海龟汤', 'difficulty': 4, 'tags': ['经典', '食人', '背叛']})
+             {'id': '002', 'title': '海龟汤', 'difficulty': 4, 'tags': ('经典', '食人', '背叛')})
         ]
 
     def _parse_ai_generated_content(self, content: str) -> Tuple[str, str]:
         """解析AI生成的题目内容"""
         try:
-            story_match = re.search(r"故事：\s*(.*?)\s*答案：", content, re.DOTALL)
-            answer_match = re.search(r"答案：\s*(.*)", content, re.DOTALL)
+            story_match = _STORY_RE.search(content)
+            answer_match = _ANSWER_RE.search(content)
 
             if story_match and answer_match:
                 question = story_match.group(1).strip()
@@ -221,66 +417,61 @@ class TurtleSoupPlugin(Star):
         session_key = self._get_session_key(event)
 
         if session_key in self.game_states:
-            await event.send(MessageChain([Comp.Plain(self.MSG_GAME_IN_PROGRESS.format(user_id=user_id))]))
+            await self._send_static(event, self.MSG_GAME_IN_PROGRESS)
             return
 
         # 解析参数，检查是否指定了题号
-        message_parts = event.message_str.split()
+        arg = self._get_first_arg(event)
         specified_question_id = None
         
-        if len(message_parts) > 1:
+        if arg:
             try:
                 # 尝试解析题号
-                specified_question_id = message_parts[1].zfill(3)  # 补零到3位
-            except (ValueError, IndexError):
-                await event.send(MessageChain([Comp.Plain("题号格式错误，请使用数字。例如：/开始海龟汤 1")]))
+                specified_question_id = f"{int(arg):03d}"  # 补零到3位
+            except ValueError:
+                await self._send_static(event, "题号格式错误，请使用数字。例如：/开始海龟汤 1")
                 return
 
-        await event.send(MessageChain([Comp.Plain(self.MSG_DISCLAIMER.format(
-            max_questions=self.max_questions,
-            session_timeout=self.session_timeout
-        ))]))
-
         question, answer, metadata = self._get_question_and_answer(specified_question_id)
         if not question or not answer:
             if specified_question_id:
-                await event.send(MessageChain([Comp.Plain(f"未找到题号 {specified_question_id} 的题目。使用 /题库列表 查看所有可用题目。")]))
+                await self._send_text(event, f"未找到题号 {specified_question_id} 的题目。使用 /题库列表 查看所有可用题目。")
             else:
-                await event.send(MessageChain([Comp.Plain(self.MSG_NO_PRESET_QUESTIONS)]))
+                await self._send_static(event, self.MSG_NO_PRESET_QUESTIONS)
             return
 
         # 初始化游戏状态
-        game_state = {
-            "question": question,
-            "answer": answer,
-            "metadata": metadata,
-            "question_count": 0,
-            "llm_conversation_context": [],
-            "controller": None, # 将用于存储会话控制器
-        }
+        game_state = GameState(
+            question=question,
+            answer=answer,
+            metadata=metadata,
+            answer_keywords=self._extract_keywords(answer),
+        )
         self.game_states[session_key] = game_state
-        logger.debug(f"为用户 {user_id} 创建了新的游戏状态。")
+        logger.debug("为用户 %s 创建了新的游戏状态。", user_id)
 
         # 构造题目介绍信息
-        intro_text = f"📖 谜题 #{metadata['id']}"
+        intro_parts = [f"📖 谜题 #{metadata['id']}"]
         if metadata.get('title'):
-            intro_text += f" - {metadata['title']}"
-        
-        difficulty_stars = "⭐" * metadata.get('difficulty', 3)
-        intro_text += f" {difficulty_stars}\n\n"
-        
-        intro_text += f"{question}\n\n"
-        intro_text += f"请使用 `/海龟汤提问 你的问题` 开始推理\n"
-        intro_text += f"剩余提问次数：{self.max_questions}"
-
-        await event.send(MessageChain([Comp.Plain(intro_text)]))
+            intro_parts.append(f" - {metadata['title']}")
+        intro_parts.append(
+            f" {_DIFFICULTY_STARS[metadata.get('difficulty', 3)]}\n\n"
+            f"{question}\n\n"
+            f"请使用 `/海龟汤提问 你的问题` 开始推理\n"
+            f"剩余提问次数：{self.max_questions}"
+        )
+        intro_text = "".join(intro_parts)
 
         llm_provider = self.context.get_using_provider()
+        if llm_provider:
+            system_prompt = self._format_prompt(question, answer)
+            game_state.llm_conversation_context.append({"role": "system", "content": system_prompt})
+
+        # 游戏已完全就绪，依次发送规则说明和题目（聊天平台上的顺序不能打乱）
+        await self._send_static(event, self._disclaimer_text)
+        await self._send_text(event, intro_text)
         if not llm_provider:
-            await event.send(MessageChain([Comp.Plain(self.MSG_NO_AI_PROVIDER_FOR_JUDGE)]))
-        else:
-            system_prompt = self.hint_system_prompt.format(question=question, answer=answer)
-            game_state["llm_conversation_context"].append({"role": "system", "content": system_prompt})
+            await self._send_static(event, self.MSG_NO_AI_PROVIDER_FOR_JUDGE)
 
         # 定义会话等待器
         @session_waiter(timeout=self.session_timeout, record_history_chains=False)
@@ -288,24 +479,25 @@ class TurtleSoupPlugin(Star):
             """游戏的主循环，处理玩家的每一次输入。"""
             # 首次交互时，存储会话控制器
             current_game_state = self.game_states.get(session_key)
-            if current_game_state and not current_game_state.get("controller"):
-                current_game_state["controller"] = controller
-                logger.debug(f"为用户 {user_id} 的会话存储了 controller。")
+            if current_game_state and not current_game_state.controller:
+                current_game_state.controller = controller
+                logger.debug("为用户 %s 的会话存储了 controller。", user_id)
             
             await self._handle_game_turn(event)
 
         try:
-            logger.debug(f"用户 {user_id} 的海龟汤会话等待器已启动。")
+            logger.debug("用户 %s 的海龟汤会话等待器已启动。", user_id)
             await turtle_soup_waiter(event)
         except asyncio.TimeoutError:
-            logger.info(f"用户 {user_id} 的游戏会话超时。")
-            answer = self.game_states.get(session_key, {}).get("answer", "未知")
-            await event.send(MessageChain([Comp.Plain(self.MSG_TIMEOUT.format(answer=answer, user_id=user_id))]))
+            logger.info("用户 %s 的游戏会话超时。", user_id)
+            current_game_state = self.game_states.get(session_key)
+            answer = current_game_state.answer if current_game_state else "未知"
+            await self._send_text(event, self.MSG_TIMEOUT.format(answer=answer))
         except Exception as e:
             logger.error(f"海龟汤游戏会话发生未知错误: {e}", exc_info=True)
-            await event.send(MessageChain([Comp.Plain(self.MSG_UNKNOWN_ERROR.format(user_id=user_id))]))
+            await self._send_static(event, self.MSG_UNKNOWN_ERROR)
         finally:
-            logger.debug(f"用户 {user_id} 的会话等待器已结束，执行最终清理。")
+            logger.debug("用户 %s 的会话等待器已结束，执行最终清理。", user_id)
             self._cleanup_game_session(session_key)
             event.stop_event()
 
@@ -315,51 +507,59 @@ class TurtleSoupPlugin(Star):
         显示题库中所有可用的题目列表。
         用法：/题库列表 [页数]
         """
-        if not self.questions_bank:
-            await event.send(MessageChain([Comp.Plain("题库为空，无法显示题目列表。")]))
+        if not self._list_pages:
+            await self._send_static(event, "题库为空，无法显示题目列表。")
             return
         
         # 解析页数参数
-        message_parts = event.message_str.split()
+        arg = self._get_first_arg(event)
         page = 1
-        if len(message_parts) > 1:
+        if arg:
             try:
-                page = int(message_parts[1])
+                page = int(arg)
                 if page < 1:
                     page = 1
             except ValueError:
-                await event.send(MessageChain([Comp.Plain("页数格式错误，请使用数字。例如：/题库列表 2")]))
+                await self._send_static(event, "页数格式错误，请使用数字。例如：/题库列表 2")
                 return
         
-        # 分页显示
+        # 分页显示，超出范围时显示最后一页
+        page = min(page, self._total_pages)
+        await self._send_static(event, self._list_pages[page - 1])
+        event.stop_event()
+
+    def _render_list_pages(self) -> List[str]:
+        """预先渲染题库列表的每一页，题库在运行期间不会变化。"""
         per_page = 10
         total_questions = len(self.questions_bank)
         total_pages = (total_questions + per_page - 1) // per_page
-        
-        if page > total_pages:
-            page = total_pages
-        
-        start_idx = (page - 1) * per_page
-        end_idx = min(start_idx + per_page, total_questions)
-        
-        result_text = f"📚 海龟汤题库 (第 {page}/{total_pages} 页)\n\n"
-        
-        for i in range(start_idx, end_idx):
-            question, answer, metadata = self.questions_bank[i]
-            difficulty_stars = "⭐" * metadata.get('difficulty', 3)
-            title = metadata.get('title', '')
-            question_id = metadata.get('id', str(i+1).zfill(3))
-            
-            result_text += f"#{question_id} {title} {difficulty_stars}\n"
-            result_text += f"{question[:30]}{'...' if len(question) > 30 else ''}\n\n"
-        
-        result_text += f"使用 `/开始海龟汤 题号` 来选择特定题目"
-        
-        if total_pages > 1:
-            result_text += f"\n使用 `/题库列表 页数` 查看其他页面"
-        
-        await event.send(MessageChain([Comp.Plain(result_text)]))
-        event.stop_event()
+        pages = []
+
+        for page in range(1, total_pages + 1):
+            start_idx = (page - 1) * per_page
+            end_idx = min(start_idx + per_page, total_questions)
+
+            result_parts = [f"📚 海龟汤题库 (第 {page}/{total_pages} 页)\n\n"]
+
+            for i in range(start_idx, end_idx):
+                question, answer, metadata = self.questions_bank[i]
+                difficulty_stars = _DIFFICULTY_STARS[metadata.get('difficulty', 3)]
+                title = metadata.get('title', '')
+                question_id = metadata.get('id', str(i+1).zfill(3))
+
+                result_parts.append(
+                    f"#{question_id} {title} {difficulty_stars}\n"
+                    f"{question[:30]}{'...' if len(question) > 30 else ''}\n\n"
+                )
+
+            result_parts.append("使用 `/开始海龟汤 题号` 来选择特定题目")
+
+            if total_pages > 1:
+                result_parts.append("\n使用 `/题库列表 页数` 查看其他页面")
+
+            pages.append("".join(result_parts))
+
+        return pages
 
     @filter.command("题目详情")
     async def question_detail(self, event: AstrMessageEvent):
@@ -367,40 +567,40 @@ class TurtleSoupPlugin(Star):
         显示指定题目的详细信息（不含答案）。
         用法：/题目详情 题号
         """
-        message_parts = event.message_str.split()
-        if len(message_parts) < 2:
-            await event.send(MessageChain([Comp.Plain("请指定题号。例如：/题目详情 1")]))
+        arg = self._get_first_arg(event)
+        if not arg:
+            await self._send_static(event, "请指定题号。例如：/题目详情 1")
             return
         
         try:
-            question_id = message_parts[1].zfill(3)
+            question_id = f"{int(arg):03d}"
         except ValueError:
-            await event.send(MessageChain([Comp.Plain("题号格式错误，请使用数字。")]))
+            await self._send_static(event, "题号格式错误，请使用数字。")
             return
         
         # 查找题目
         question, answer, metadata = self._get_question_and_answer(question_id)
         if not question:
-            await event.send(MessageChain([Comp.Plain(f"未找到题号 {question_id} 的题目。")]))
+            await self._send_text(event, f"未找到题号 {question_id} 的题目。")
             return
         
-        difficulty_stars = "⭐" * metadata.get('difficulty', 3)
-        
-        detail_text = f"📖 题目详情 #{metadata.get('id', question_id)}\n\n"
+        detail_parts = [f"📖 题目详情 #{metadata.get('id', question_id)}\n\n"]
         if metadata.get('title'):
-            detail_text += f"标题: {metadata['title']}\n"
-        detail_text += f"难度: {difficulty_stars}\n\n"
-        detail_text += f"题目内容：\n{question}\n\n"
-        detail_text += f"使用 `/开始海龟汤 {question_id}` 开始挑战这道题目"
+            detail_parts.append(f"标题: {metadata['title']}\n")
+        detail_parts.append(
+            f"难度: {_DIFFICULTY_STARS[metadata.get('difficulty', 3)]}\n\n"
+            f"题目内容：\n{question}\n\n"
+            f"使用 `/开始海龟汤 {question_id}` 开始挑战这道题目"
+        )
         
-        await event.send(MessageChain([Comp.Plain(detail_text)]))
+        await self._send_text(event, "".join(detail_parts))
         event.stop_event()
 
     async def _handle_game_turn(self, event: AstrMessageEvent):
         """处理游戏中的一个回合，包括命令和玩家提问。"""
         user_id = event.get_sender_id()
         player_input = event.message_str.strip()
-        logger.debug(f"用户 {user_id} 的输入: '{player_input}'")
+        logger.debug("用户 %s 的输入: '%s'", user_id, player_input)
 
         session_key = self._get_session_key(event)
 
@@ -412,55 +612,42 @@ class TurtleSoupPlugin(Star):
 
         # --- 命令处理 ---
         # 框架会自动移除命令前缀'/'，所以这里直接比较字符串
+        handler = self._turn_commands.get(player_input)
+        if handler:
+            await handler(event)
+            return
+
         # 检查是否是开始游戏的命令，以防止在游戏中误触
         if player_input.startswith('开始海龟汤'):
-            await event.send(MessageChain([Comp.Plain(self.MSG_GAME_IN_PROGRESS)]))
+            await self._send_static(event, self.MSG_GAME_IN_PROGRESS)
             # 重置超时，因为用户有活动
-            controller = game_state.get("controller")
-            if controller:
-                controller.keep(timeout=self.session_timeout, reset_timeout=True)
-            return
-
-        if player_input == '结束海龟汤':
-            await self.end_turtle_soup(event)
-            return
-        if player_input == '强制结束海龟汤':
-            await self.force_end_turtle_soup(event)
-            return
-        if player_input == '公布答案':
-            await self.reveal_answer(event)
-            return
-        if player_input == '换一题':
-            await self.change_question(event)
-            return
-        if player_input == '海龟汤帮助':
-            await self._send_help_message(event)
+            self._keep_session_alive(game_state)
             return
         if player_input.startswith('海龟汤提问'):
             message_parts = player_input.split(maxsplit=1)
             if len(message_parts) < 2 or not message_parts[1].strip():
-                await event.send(MessageChain([Comp.Plain(
+                await self._send_static(
+                    event,
                     "❌ 问题内容为空\n\n"
                     "请使用正确格式：`/海龟汤提问 你的问题`\n\n"
                     "例如：`/海龟汤提问 他是故意的吗？`"
-                )]))
+                )
                 return
             
             question = message_parts[1].strip()
-            await self._handle_turtle_soup_question(event, question)
+            await self._handle_turtle_soup_question(event, question, session_key, event.get_session_id())
             return
         if player_input == 'admin end turtle' and event.is_admin():
             await self._admin_end_all_games(event)
             return
 
         # 更新会话超时
-        controller = game_state.get("controller")
-        if not controller:
+        if not game_state.controller:
             logger.error(f"用户 {user_id} 的游戏状态中没有找到 controller！")
-            self._cleanup_game_session(user_id)
+            self._cleanup_game_session(session_key)
             return
             
-        controller.keep(timeout=self.session_timeout, reset_timeout=True)
+        self._keep_session_alive(game_state)
 
         if not player_input:
             return
@@ -468,46 +655,88 @@ class TurtleSoupPlugin(Star):
         # 如果用户输入的不是已定义的命令，直接忽略
         return
 
-    def _get_question_and_answer(self, question_id: str = None) -> Tuple[str, str, dict]:
-        """从题库中选择一个问题，支持指定题号。"""
+    def _get_question_and_answer(self, question_id: str = None, exclude_id: str = None) -> Tuple[str, str, dict]:
+        """从题库中选择一个问题，支持指定题号，随机选择时可排除一个题号。"""
         if not self.questions_bank:
             return None, None, {}
         
         if question_id:
-            # 查找指定题号的题目
-            for question, answer, metadata in self.questions_bank:
-                if metadata.get('id') == question_id:
-                    return question, answer, metadata
-            return None, None, {}  # 未找到指定题目
+            # 查找指定题号的题目，未找到时返回空结果
+            return self._questions_by_id.get(question_id, (None, None, {}))
         else:
-            # 随机选择题目
-            question, answer, metadata = random.choice(self.questions_bank)
-            return question, answer, metadata
+            # 随机选择题目；需要排除时从其余题目中等概率抽取一个
+            excluded_position = self._question_positions.get(exclude_id) if exclude_id else None
+            if excluded_position is None or len(self.questions_bank) < 2:
+                return self._rng.choice(self.questions_bank)
+            position = self._rng.randrange(len(self.questions_bank) - 1)
+            if position >= excluded_position:
+                position += 1
+            return self.questions_bank[position]
+
+    def _keep_session_alive(self, game_state: GameState):
+        """重置会话超时；距上次重置不足容差时跳过，避免频繁重建计时器。"""
+        controller = game_state.controller
+        if not controller:
+            return
+        expiry = time.monotonic() + self.session_timeout
+        if expiry - game_state.timer_expiry > _KEEP_ALIVE_SLACK:
+            controller.keep(timeout=self.session_timeout, reset_timeout=True)
+            game_state.timer_expiry = expiry
 
     def _cleanup_game_session(self, session_key: tuple):
         """清理指定用户的游戏会话和状态。"""
         game_state = self.game_states.pop(session_key, None)
 
         if game_state:
-            controller = game_state.get("controller")
-            if controller:
-                controller.stop()
-            logger.info(f"用户 {session_key} 的海龟汤游戏状态已清理。")
+            self._cleanup_game_state(game_state)
+            logger.info("用户 %s 的海龟汤游戏状态已清理。", session_key)
 
-    async def _get_ai_judge_response(self, player_question: str, game_state: dict, session_id: str) -> str:
-        """获取AI对玩家问题的判断（是/否/无关）。"""
-        llm_provider = self.context.get_using_provider()
+    def _cleanup_game_state(self, game_state: GameState):
+        """清理已从 game_states 中移除的游戏状态。"""
+        controller = game_state.controller
+        if controller:
+            controller.stop()
+
+    def _get_cache_key(self, game_state: GameState, text: str) -> Tuple[str, str]:
+        """生成LLM回答缓存的key，忽略空白和大小写差异。"""
+        return game_state.metadata.get('id', ''), _WHITESPACE_RE.sub('', text).lower()
+
+    def _store_cache(self, cache: OrderedDict, key: Tuple[str, str], value):
+        """写入LLM回答缓存，超出容量时淘汰最久未使用的条目。"""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > _LLM_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    async def _get_ai_judge_response(self, player_question: str, game_state: GameState, session_id: str, llm_provider, use_cache: bool = True) -> str:
+        """获取AI对玩家问题的判断（是/否/无关），llm_provider 由调用方获取，可能为空。"""
         if not llm_provider:
-            return self._simple_judge(player_question, game_state["answer"])
+            return self._simple_judge(player_question, game_state.answer)
+
+        context = game_state.llm_conversation_context
+
+        # 与上一个问题完全相同时直接复用上一次的回答（use_cache=False 时强制重新请求）
+        if (use_cache and len(context) >= 2 and context[-1]["role"] == "assistant"
+                and context[-2]["role"] == "user" and context[-2]["content"] == player_question):
+            return context[-1]["content"]
+
+        cache_key = self._get_cache_key(game_state, player_question)
+        cached_answer = self._judge_cache.get(cache_key) if use_cache else None
 
         # 添加玩家问题到对话历史
-        game_state["llm_conversation_context"].append({"role": "user", "content": player_question})
+        context.append({"role": "user", "content": player_question})
+
+        if cached_answer is not None:
+            self._judge_cache.move_to_end(cache_key)
+            context.append({"role": "assistant", "content": cached_answer})
+            self._trim_conversation_context(context)
+            return cached_answer
 
         # 调用LLM获取回答
         llm_response = await llm_provider.text_chat(
             prompt="",
             session_id=session_id,
-            contexts=game_state["llm_conversation_context"],
+            contexts=context,
         )
         ai_raw_answer = llm_response.completion_text.strip()
         
@@ -515,20 +744,33 @@ class TurtleSoupPlugin(Star):
         ai_answer = self._validate_ai_response(ai_raw_answer)
         
         # 添加修正后的AI回答到对话历史
-        game_state["llm_conversation_context"].append({"role": "assistant", "content": ai_answer})
+        context.append({"role": "assistant", "content": ai_answer})
+        self._trim_conversation_context(context)
+
+        # 只缓存AI直接给出的标准回答，经关键词修正的回答仅用于本轮
+        if use_cache and ai_raw_answer.translate(_RESPONSE_PUNCTUATION) in _VALID_RESPONSES:
+            self._store_cache(self._judge_cache, cache_key, ai_answer)
         
         return ai_answer
 
+    def _trim_conversation_context(self, context: List[dict]):
+        """只保留系统提示词和最近若干轮问答，避免每次请求重复发送全部历史。"""
+        max_messages = 1 + 2 * _CONTEXT_MAX_TURNS
+        if len(context) > max_messages:
+            del context[1:len(context) - 2 * _CONTEXT_MAX_TURNS]
+
     def _validate_ai_response(self, ai_response: str) -> str:
         """验证并修正AI回答格式，确保只返回标准答案"""
         # 移除多余的空白字符
         response = ai_response.strip()
-        
-        # 允许的标准回答
-        valid_responses = ['是', '否', '无关', '请重新提问', '很接近了', '你猜对了一部分']
+
+        # 绝大多数情况下AI会直接返回标准回答（可能带句末标点）
+        exact = response.translate(_RESPONSE_PUNCTUATION)
+        if exact in _VALID_RESPONSES:
+            return exact
         
         # 检查是否包含标准回答（优先匹配精确答案）
-        for valid in valid_responses:
+        for valid in _VALID_RESPONSE_PRIORITY:
             if valid in response:
                 return valid
         
@@ -551,12 +793,18 @@ class TurtleSoupPlugin(Star):
             return "是"
         return "否"
 
-    async def _is_answer_correct(self, player_guess: str, answer: str, session_id: str) -> bool:
-        """使用LLM判断玩家是否猜对了答案。"""
-        llm_provider = self.context.get_using_provider()
+    async def _is_answer_correct(self, player_guess: str, game_state: GameState, session_id: str, llm_provider) -> bool:
+        """使用LLM判断玩家是否猜对了答案，llm_provider 由调用方获取，可能为空。"""
+        answer = game_state.answer
         if not llm_provider:
             # 如果没有LLM，使用改进的关键词匹配
-            return self._simple_answer_check(player_guess, answer)
+            return self._simple_answer_check(player_guess, game_state.answer_keywords)
+
+        cache_key = self._get_cache_key(game_state, player_guess)
+        cached_verdict = self._answer_check_cache.get(cache_key)
+        if cached_verdict is not None:
+            self._answer_check_cache.move_to_end(cache_key)
+            return cached_verdict
 
         try:
             prompt = self.answer_check_prompt.format(answer=answer, guess=player_guess)
@@ -566,43 +814,36 @@ class TurtleSoupPlugin(Star):
                 contexts=[]
             )
             response_text = llm_response.completion_text.strip()
-            logger.debug(f"答案检查LLM响应: '{response_text}'")
-            return "是" in response_text
+            logger.debug("答案检查LLM响应: '%s'", response_text)
+            is_correct = "是" in response_text
+            # 只缓存明确的"是"/"否"，格式异常的回复仅用于本轮判断
+            if response_text.translate(_RESPONSE_PUNCTUATION) in ('是', '否'):
+                self._store_cache(self._answer_check_cache, cache_key, is_correct)
+            return is_correct
         except Exception as e:
             logger.error(f"使用LLM检查答案时出错: {e}")
             # 发生错误时，使用改进的关键词匹配
-            return self._simple_answer_check(player_guess, answer)
+            return self._simple_answer_check(player_guess, game_state.answer_keywords)
+
+    def _extract_keywords(self, text: str) -> frozenset:
+        """提取用于简单答案检查的关键词，中文按相邻两字切分"""
+        keywords = set()
+        for token in _KEYWORD_RE.findall(text.lower()):
+            if '\u4e00' <= token[0] <= '\u9fff':
+                keywords.update(token[i:i + 2] for i in range(len(token) - 1))
+            else:
+                keywords.add(token)
+        return frozenset(keywords - _STOP_WORDS)
 
-    def _simple_answer_check(self, player_guess: str, answer: str) -> bool:
+    def _simple_answer_check(self, player_guess: str, answer_keywords: frozenset) -> bool:
         """改进的简单答案检查，当没有LLM时使用"""
-        # 将答案和猜测都转换为小写进行比较
-        guess_lower = player_guess.lower()
-        answer_lower = answer.lower()
-        
-        # 提取答案中的关键词（去除常见的连接词）
-        stop_words = {'的', '了', '是', '在', '和', '与', '或', '但', '然后', '因为', '所以', '这', '那', '一个', '就', '也', '都'}
-        
-        # 简单的关键词提取
-        answer_words = set()
-        for word in answer_lower:
-            if len(word) > 1 and word not in stop_words:
-                answer_words.add(word)
-        
-        # 检查猜测中是否包含答案的关键概念
-        # 这里可以根据具体需求调整匹配度
-        match_count = 0
-        total_key_words = len(answer_words)
-        
-        for word in answer_words:
-            if word in guess_lower:
-                match_count += 1
-        
+        if not answer_keywords:
+            return False
+
         # 如果匹配的关键词达到一定比例，认为是正确的
-        if total_key_words > 0:
-            match_ratio = match_count / total_key_words
-            return match_ratio >= 0.5  # 提高到50%的关键词匹配才认为正确
-        
-        return False
+        guess_keywords = self._extract_keywords(player_guess)
+        match_ratio = len(answer_keywords & guess_keywords) / len(answer_keywords)
+        return match_ratio >= 0.5  # 提高到50%的关键词匹配才认为正确
 
     @filter.command("结束海龟汤")
     async def cmd_end_turtle_soup(self, event: AstrMessageEvent):
@@ -631,119 +872,124 @@ class TurtleSoupPlugin(Star):
     @filter.command("海龟汤提问")
     async def cmd_turtle_soup_question(self, event: AstrMessageEvent):
         """命令：在游戏中提问。用法：/海龟汤提问 你的问题"""
-        user_id = event.get_sender_id()
-        
         # 检查是否有正在进行的游戏
         session_key = self._get_session_key(event)
         if session_key not in self.game_states:
-            await event.send(MessageChain([Comp.Plain("❌ 没有正在进行的游戏，请先使用 `/开始海龟汤` 开始游戏。")]))
+            await self._send_static(event, "❌ 没有正在进行的游戏，请先使用 `/开始海龟汤` 开始游戏。")
             event.stop_event()
             return
             
         # 解析问题内容
-        message_parts = event.message_str.split(maxsplit=1)
-        if len(message_parts) < 2 or not message_parts[1].strip():
-            await event.send(MessageChain([Comp.Plain(
+        question = self._get_command_arg(event)
+        if not question:
+            await self._send_static(
+                event,
                 "❌ 问题内容为空\n\n"
                 "请使用正确格式：`/海龟汤提问 你的问题`\n\n"
                 "例如：`/海龟汤提问 他是故意的吗？`"
-            )]))
+            )
             event.stop_event()
             return
-            
-        question = message_parts[1].strip()
         
         # 处理游戏提问
-        await self._handle_turtle_soup_question(event, question)
+        await self._handle_turtle_soup_question(event, question, session_key, event.get_session_id())
         event.stop_event()
 
-    async def _handle_turtle_soup_question(self, event: AstrMessageEvent, question: str):
-        """处理海龟汤游戏中的提问"""
-        user_id = event.get_sender_id()
-        session_key = self._get_session_key(event)
+    async def _handle_turtle_soup_question(self, event: AstrMessageEvent, question: str, session_key: str, session_id: str):
+        """处理海龟汤游戏中的提问，session_key 和 session_id 由调用方预先获取。"""
         game_state = self.game_states.get(session_key)
 
         if not game_state:
-            await event.send(MessageChain([Comp.Plain("❌ 游戏状态异常，请重新开始游戏。")]))
+            await self._send_static(event, "❌ 游戏状态异常，请重新开始游戏。")
             return
             
-        controller = game_state.get("controller")
-        if controller:
-            controller.keep(timeout=self.session_timeout, reset_timeout=True)
+        self._keep_session_alive(game_state)
         
-        game_state["question_count"] += 1
+        game_state.question_count += 1
+        # 本回合内的答案判断和问题判断共用同一个LLM提供商
+        llm_provider = self.context.get_using_provider()
 
         # 判断是否是猜测答案
         # 更精确地判断是否为猜测答案：需要包含明确的推理或断言
-        guess_keywords = ["答案是", "真相是", "因为", "所以", "是因为", "原因是", "我觉得是", "我认为是", "应该是", "一定是", "肯定是"]
-        is_a_guess = (any(keyword in question for keyword in guess_keywords) or 
-                     (len(question) > 25 and any(word in question for word in ["导致", "造成", "结果", "发生了", "事实是"])) or
-                     ("是" in question and len(question) > 15 and any(word in question for word in ["死", "杀", "害", "做", "发生"])))
+        is_a_guess = self._is_a_guess(question)
         if is_a_guess:
-            await event.send(MessageChain([Comp.Plain(self.MSG_AI_CHECKING_ANSWER)]))
+            await self._send_static(event, self.MSG_AI_CHECKING_ANSWER)
             
-            is_correct = await self._is_answer_correct(question, game_state["answer"], event.get_session_id())
+            is_correct = await self._is_answer_correct(question, game_state, session_id, llm_provider)
             
-            # 再次检查游戏状态，防止在AI判断期间游戏被结束
-            if session_key not in self.game_states:
+            # 再次检查游戏状态，防止在AI判断期间游戏被结束或替换
+            if self.game_states.get(session_key) is not game_state:
                 return
 
             if is_correct:
-                metadata = game_state.get("metadata", {})
-                correct_text = f"🎉 恭喜答对了！\n\n"
-                correct_text += f"完整答案：\n{game_state['answer']}\n\n"
-                correct_text += f"用了 {game_state['question_count']} 次提问找到真相！\n"
+                metadata = game_state.metadata
+                correct_parts = [
+                    "🎉 恭喜答对了！\n\n"
+                    f"完整答案：\n{game_state.answer}\n\n"
+                    f"用了 {game_state.question_count} 次提问找到真相！\n"
+                ]
                 
                 # 游戏结束后显示标签
                 if metadata.get('tags'):
-                    correct_text += f"🏷️ 标签: {', '.join(metadata['tags'])}\n"
+                    correct_parts.append(f"🏷️ 标签: {', '.join(metadata['tags'])}\n")
                 
-                correct_text += f"使用 /开始海龟汤 挑战新题目。"
+                correct_parts.append("使用 /开始海龟汤 挑战新题目。")
                 
-                await event.send(MessageChain([Comp.Plain(correct_text)]))
+                await self._send_text(event, "".join(correct_parts))
                 self._cleanup_game_session(session_key)
                 return
         
         # 检查是否超出提问次数
-        if game_state["question_count"] > self.max_questions:
-            metadata = game_state.get("metadata", {})
-            timeout_text = f"🎯 游戏结束！\n\n"
-            timeout_text += f"你已经用完了 {self.max_questions} 次提问机会。\n\n"
-            timeout_text += f"正确答案是：\n{game_state['answer']}\n\n"
+        if game_state.question_count > self.max_questions:
+            metadata = game_state.metadata
+            timeout_parts = [
+                "🎯 游戏结束！\n\n"
+                f"你已经用完了 {self.max_questions} 次提问机会。\n\n"
+                f"正确答案是：\n{game_state.answer}\n\n"
+            ]
             
             # 显示标签
             if metadata.get('tags'):
-                timeout_text += f"🏷️ 标签: {', '.join(metadata['tags'])}\n"
+                timeout_parts.append(f"🏷️ 标签: {', '.join(metadata['tags'])}\n")
             
-            timeout_text += f"感谢参与！使用 /开始海龟汤 可以开始新游戏。"
+            timeout_parts.append("感谢参与！使用 /开始海龟汤 可以开始新游戏。")
             
-            await event.send(MessageChain([Comp.Plain(timeout_text)]))
+            await self._send_text(event, "".join(timeout_parts))
             self._cleanup_game_session(session_key)
             return
 
         # 调用AI进行判断
-        #await event.send(MessageChain([Comp.Plain(self.MSG_AI_THINKING)]))
+        #await self._send_text(event, self.MSG_AI_THINKING)
         
         try:
-            ai_answer = await self._get_ai_judge_response(question, game_state, event.get_session_id())
+            ai_answer = await self._get_ai_judge_response(question, game_state, session_id, llm_provider, use_cache=not is_a_guess)
             
-            # 再次检查，防止在AI响应期间游戏被终止
-            if session_key not in self.game_states:
+            # 再次检查，防止在AI响应期间游戏被终止或替换
+            if self.game_states.get(session_key) is not game_state:
                 return
 
-            remaining_questions = self.max_questions - game_state["question_count"]
-            await event.send(MessageChain([Comp.Plain(self.MSG_ROUND_RESULT.format(
-                question_count=game_state["question_count"],
+            remaining_questions = self.max_questions - game_state.question_count
+            await self._send_text(event, self.MSG_ROUND_RESULT.format(
+                question_count=game_state.question_count,
                 player_question=question,
                 ai_answer=ai_answer,
                 remaining_questions=remaining_questions
-            ))]))
+            ))
             
         except Exception as e:
             logger.error(f"AI响应时发生错误: {e}")
-            await event.send(MessageChain([Comp.Plain(self.MSG_AI_ERROR)]))
+            await self._send_static(event, self.MSG_AI_ERROR)
             return
 
+    def _is_a_guess(self, question: str) -> bool:
+        """判断玩家的提问是否为对答案的猜测。"""
+        hits = set()
+        for match in _GUESS_RE.finditer(question):
+            hits |= _GUESS_CATEGORIES[match.group(1)]
+        return ("strong" in hits or
+                (len(question) > 25 and "conclusion" in hits) or
+                (len(question) > 15 and "affirm" in hits and "event" in hits))
+
     async def end_turtle_soup(self, event: AstrMessageEvent):
         """正常结束当前用户的海龟汤游戏。"""
         user_id = event.get_sender_id()
@@ -751,26 +997,30 @@ class TurtleSoupPlugin(Star):
         game_state = self.game_states.get(session_key)
 
         if game_state:
-            answer = game_state.get("answer", "未知")
-            question_count = game_state.get("question_count", 0)
-            metadata = game_state.get("metadata", {})
+            answer = game_state.answer
+            question_count = game_state.question_count
+            metadata = game_state.metadata
             
-            end_text = f"👋 游戏结束 👋\n\n"
-            end_text += f"你主动结束了游戏。\n\n"
-            end_text += f"正确答案是：\n{answer}\n\n"
+            end_parts = [
+                "👋 游戏结束 👋\n\n"
+                "你主动结束了游戏。\n\n"
+                f"正确答案是：\n{answer}\n\n"
+            ]
             
             # 显示标签
             if metadata.get('tags'):
-                end_text += f"🏷️ 标签: {', '.join(metadata['tags'])}\n"
+                end_parts.append(f"🏷️ 标签: {', '.join(metadata['tags'])}\n")
             
-            end_text += f"你在结束前共提问了 {question_count} 次。\n"
-            end_text += f"感谢参与！使用 /开始海龟汤 可以开始新游戏。"
+            end_parts.append(
+                f"你在结束前共提问了 {question_count} 次。\n"
+                "感谢参与！使用 /开始海龟汤 可以开始新游戏。"
+            )
             
-            await event.send(MessageChain([Comp.Plain(end_text)]))
+            await self._send_text(event, "".join(end_parts))
             
             self._cleanup_game_session(session_key)
         else:
-            await event.send(MessageChain([Comp.Plain(self.MSG_NO_GAME_TO_END)]))
+            await self._send_static(event, self.MSG_NO_GAME_TO_END)
 
     async def force_end_turtle_soup(self, event: AstrMessageEvent):
         """强制结束当前用户的海龟汤游戏。"""
@@ -778,30 +1028,33 @@ class TurtleSoupPlugin(Star):
         session_key = self._get_session_key(event)
         if session_key in self.game_states:
             self._cleanup_game_session(session_key)
-            await event.send(MessageChain([Comp.Plain(self.MSG_GAME_FORCE_ENDED)]))
+            await self._send_static(event, self.MSG_GAME_FORCE_ENDED)
         else:
-            await event.send(MessageChain([Comp.Plain(self.MSG_NO_GAME_TO_END)]))
+            await self._send_static(event, self.MSG_NO_GAME_TO_END)
 
     async def reveal_answer(self, event: AstrMessageEvent):
         """在游戏中提前查看答案。"""
         user_id = event.get_sender_id()
         session_key = self._get_session_key(event)
-        if session_key in self.game_states:
-            game_state = self.game_states[session_key]
-            metadata = game_state.get("metadata", {})
-            
-            reveal_text = f"🎯 答案公布 🎯\n\n"
-            reveal_text += f"📖 题目 #{metadata.get('id', 'Unknown')}"
-            if metadata.get('title'):
-                reveal_text += f" - {metadata['title']}"
-            reveal_text += f"\n\n题目：{game_state['question']}\n\n"
-            reveal_text += f"完整答案：\n{game_state['answer']}\n\n"
-            reveal_text += f"你已经提问了 {game_state['question_count']} 次。\n"
-            reveal_text += f"游戏将继续进行，您也可以选择 /结束海龟汤。"
+        game_state = self.game_states.get(session_key)
+        if game_state:
+            # 提问次数未变化时直接复用上次生成的文本
+            if game_state.reveal_text is None or game_state.reveal_count != game_state.question_count:
+                metadata = game_state.metadata
+                title_text = f" - {metadata['title']}" if metadata.get('title') else ""
+                game_state.reveal_text = (
+                    "🎯 答案公布 🎯\n\n"
+                    f"📖 题目 #{metadata.get('id', 'Unknown')}{title_text}\n\n"
+                    f"题目：{game_state.question}\n\n"
+                    f"完整答案：\n{game_state.answer}\n\n"
+                    f"你已经提问了 {game_state.question_count} 次。\n"
+                    "游戏将继续进行，您也可以选择 /结束海龟汤。"
+                )
+                game_state.reveal_count = game_state.question_count
             
-            await event.send(MessageChain([Comp.Plain(reveal_text)]))
+            await self._send_text(event, game_state.reveal_text)
         else:
-            await event.send(MessageChain([Comp.Plain(self.MSG_NO_GAME_TO_END)]))
+            await self._send_static(event, self.MSG_NO_GAME_TO_END)
 
     async def change_question(self, event: AstrMessageEvent):
         """在游戏中更换题目。"""
@@ -810,135 +1063,96 @@ class TurtleSoupPlugin(Star):
         game_state = self.game_states.get(session_key)
 
         if not game_state:
-            await event.send(MessageChain([Comp.Plain(self.MSG_NO_GAME_TO_END)]))
+            await self._send_static(event, self.MSG_NO_GAME_TO_END)
             return
             
-        # 获取新题目，确保与当前题目不同
-        current_question = game_state["question"]
-        max_attempts = 10  # 最多尝试10次避免无限循环
-        attempts = 0
-        
-        while attempts < max_attempts:
-            new_question, new_answer, new_metadata = self._get_question_and_answer()
-            if new_question and new_answer and new_question != current_question:
-                break
-            attempts += 1
+        # 获取新题目，确保与当前题目不同（题库只有一题时沿用当前题目）
+        new_question, new_answer, new_metadata = self._get_question_and_answer(exclude_id=game_state.metadata.get('id'))
         
         if not new_question or not new_answer:
-            await event.send(MessageChain([Comp.Plain("抱歉，无法获取新题目。请稍后再试。")]))
+            await self._send_static(event, "抱歉，无法获取新题目。请稍后再试。")
             return
             
         # 更新游戏状态
-        game_state["question"] = new_question
-        game_state["answer"] = new_answer
-        game_state["metadata"] = new_metadata
-        game_state["question_count"] = 0  # 重置提问次数
-        game_state["llm_conversation_context"] = []  # 清空对话历史
+        game_state.question = new_question
+        game_state.answer = new_answer
+        game_state.metadata = new_metadata
+        game_state.question_count = 0  # 重置提问次数
+        game_state.answer_keywords = self._extract_keywords(new_answer)
+        game_state.reveal_text = None
+        game_state.llm_conversation_context = context = []  # 清空对话历史
         
         # 重新设置LLM上下文
         llm_provider = self.context.get_using_provider()
         if llm_provider:
-            system_prompt = self.hint_system_prompt.format(question=new_question, answer=new_answer)
-            game_state["llm_conversation_context"].append({"role": "system", "content": system_prompt})
+            system_prompt = self._format_prompt(new_question, new_answer)
+            context.append({"role": "system", "content": system_prompt})
         
         # 重置会话超时
-        controller = game_state.get("controller")
-        if controller:
-            controller.keep(timeout=self.session_timeout, reset_timeout=True)
+        self._keep_session_alive(game_state)
             
         # 构造新题目介绍信息
-        change_text = f"🔄 换题成功！\n\n"
-        change_text += f"📖 新题目 #{new_metadata['id']}"
-        if new_metadata.get('title'):
-            change_text += f" - {new_metadata['title']}"
-        
-        difficulty_stars = "⭐" * new_metadata.get('difficulty', 3)
-        change_text += f"\n🌟 难度: {difficulty_stars}\n\n"
-        
-        change_text += f"题目：\n{new_question}\n\n"
-        change_text += f"提问次数已重置，你现在有 {self.max_questions} 次新的提问机会。\n"
-        change_text += f"请开始你的推理！"
+        title_text = f" - {new_metadata['title']}" if new_metadata.get('title') else ""
+        difficulty_stars = _DIFFICULTY_STARS[new_metadata.get('difficulty', 3)]
+        change_text = (
+            "🔄 换题成功！\n\n"
+            f"📖 新题目 #{new_metadata['id']}{title_text}\n"
+            f"🌟 难度: {difficulty_stars}\n\n"
+            f"题目：\n{new_question}\n\n"
+            f"提问次数已重置，你现在有 {self.max_questions} 次新的提问机会。\n"
+            "请开始你的推理！"
+        )
             
-        await event.send(MessageChain([Comp.Plain(change_text)]))
+        await self._send_text(event, change_text)
         
-        logger.info(f"用户 {user_id} 成功更换题目：{new_question[:50]}...")
+        logger.info("用户 %s 成功更换题目：%.50s...", user_id, new_question)
 
     async def _admin_end_all_games(self, event: AstrMessageEvent):
         """强制结束所有游戏的核心逻辑。"""
         if not self.game_states:
-            await event.send(MessageChain([Comp.Plain("当前没有活跃的海龟汤游戏。")]))
+            await self._send_static(event, "当前没有活跃的海龟汤游戏。")
             return
 
-        stopped_count = len(self.game_states)
-        # 创建一个副本进行迭代，因为 _cleanup_game_session 会修改字典
-        for session_key in list(self.game_states.keys()):
-            self._cleanup_game_session(session_key)
+        # 整体替换为新字典后再清理旧状态，无需复制或逐个弹出
+        game_states, self.game_states = self.game_states, {}
+        stopped_count = len(game_states)
+        for game_state in game_states.values():
+            self._cleanup_game_state(game_state)
 
-        await event.send(MessageChain([Comp.Plain(
+        await self._send_text(
+            event,
             f"✅ 管理员操作完成。\n"
             f"已强制终止所有 {stopped_count} 个活跃的海龟汤游戏。"
-        )]))
-        logger.info(f"管理员强制结束了所有 {stopped_count} 个海龟汤游戏。")
+        )
+        logger.info("管理员强制结束了所有 %d 个海龟汤游戏。", stopped_count)
 
     @filter.command("admin end turtle")
+    @require_admin
     async def cmd_admin_end_all_turtle_games(self, event: AstrMessageEvent):
         """
         管理员命令：立即强制结束所有在线的海龟汤游戏。
         """
-        if not event.is_admin():
-            await event.send(MessageChain([Comp.Plain("❌ 权限不足，只有管理员可操作此命令。")]))
-            event.stop_event()
-            return
-        
         await self._admin_end_all_games(event)
         event.stop_event()
 
     async def _send_help_message(self, event: AstrMessageEvent):
-        """发送帮助信息。"""
-        help_message = (
-            "🐢 海龟汤推理游戏 - 帮助手册 🐢\n\n"
-            "欢迎来到由AI驱动的海龟汤推理世界！\n\n"
-            "基本指令:\n"
-            "  - `/开始海龟汤`：随机开始一局新游戏\n"
-            "  - `/开始海龟汤 题号`：选择特定题目开始游戏\n"
-            "  - `/海龟汤提问 你的问题`：在游戏中提问\n"
-            "  - `/结束海龟汤`：主动结束当前游戏并查看答案\n"
-            "  - `/强制结束海龟汤`：立即强制结束当前游戏\n"
-            "  - `/公布答案`：在不结束游戏的情况下查看答案\n"
-            "  - `/换一题`：更换当前题目，提问次数重置\n\n"
-            "题库指令:\n"
-            "  - `/题库列表`：查看所有可用题目\n"
-            "  - `/题库列表 页数`：查看指定页的题目列表\n"
-            "  - `/题目详情 题号`：查看指定题目的详细信息\n\n"
-            "管理员指令:\n"
-            "  - `/admin end turtle`：强制结束所有正在进行的游戏\n\n"
-            "💡 游戏玩法:\n"
-            "  - 游戏开始后，系统会给出一个看似不合理的情景\n"
-            "  - 你的任务是提出可以用'是'、'否'或'无关'回答的问题\n"
-            "  - 提问方式: 使用 `/海龟汤提问 你的问题` 格式\n"
-            "  - 当你觉得已经知道真相时，可以用 `/海龟汤提问 答案是...` 格式说出答案\n"
-            f"  - 每局游戏有 {self.max_questions} 次提问机会和 {self.session_timeout} 秒思考时间\n\n"
-            "🎯 题目选择:\n"
-            "  - 题目按难度分为 1-5 星级（⭐-⭐⭐⭐⭐⭐）\n"
-            "  - 可以通过题号直接选择喜欢的题目\n"
-            "  - 每个题目都有独特的标题便于识别\n\n"
-            "祝您推理愉快！🕵️‍♀️"
-        )
-        await event.send(MessageChain([Comp.Plain(help_message)]))
+        """发送帮助信息，供游戏中的命令分发使用。"""
+        await self._send_static(event, self._help_message)
 
     @filter.command("海龟汤帮助")
     async def turtle_soup_help(self, event: AstrMessageEvent):
         """
         显示海龟汤推理游戏插件的所有可用命令。
         """
-        await self._send_help_message(event)
+        await event.send(_static_chain(self._help_message))
         event.stop_event()
 
     async def terminate(self):
         """插件终止时调用，用于清理所有活跃的游戏会话。"""
         logger.info("正在终止 TurtleSoupPlugin 并清理所有活跃的游戏会话...")
         if self.game_states:
-            for session_key in list(self.game_states.keys()):
-                self._cleanup_game_session(session_key)
+            game_states, self.game_states = self.game_states, {}
+            for game_state in game_states.values():
+                self._cleanup_game_state(game_state)
             logger.info("所有活跃的海龟汤游戏会话已被终止。")
         logger.info("TurtleSoupPlugin terminated。")